@@ -238,6 +238,17 @@ This is NOT investment advice — only a behavioral insight.>
 <3–5 sentences explaining how the user’s answers reflect their decision style, emotional patterns,
 reaction to gains, losses, volatility, and market uncertainty. Keep it readable and human.>
 
+<!-- PROFILE_DATA: <dimension>=<letter>; <dimension>=<letter>; ... -->
+
+The PROFILE_DATA line is machine-readable and MUST be the last line.
+• Include one <dimension>=<letter> pair for EVERY behavioral question asked, in order.
+• <letter> is the user's answer: A, B, C, or D.
+• <dimension> must be one of these exact keys:
+  loss_reaction, gain_reaction, volatility_comfort, decision_speed,
+  emotional_control, risk_appetite, experience_judgment, position_sizing,
+  consistency, impulse_vs_logic
+• Repeat a key if that dimension was asked more than once.
+
 ---------------------------------------------------------
 ABSOLUTE RESTRICTIONS
 ---------------------------------------------------------
@@ -26,6 +26,11 @@ Keep everything simple and follow steps in order.
 ---------------------------------------------------------
 STEP 0 — ASSET VALIDATION
 ---------------------------------------------------------
+• If the message starts with “ASSET_CONFIRMED: <asset> (<symbol>, <type>)”,
+  the asset has already been validated.
+  Use exactly that asset, do NOT ask for clarification,
+  and go directly to STEP 1.
+
 • Identify the asset clearly based on the user’s message.
 
 • Accept ALL of the following as valid assets:
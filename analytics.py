@@ -0,0 +1,398 @@
+# analytics.py
+
+import glob
+import json
+import os
+import re
+import tempfile
+import time
+from fractions import Fraction
+
+
+# The risk questionnaire answers on a fixed A–D scale (cautious → impulsive),
+# so every per-dimension score is a mean of small integers in [1, 4].
+ANSWER_SCORES = {"A": 1, "B": 2, "C": 3, "D": 4}
+
+DIMENSIONS = [
+    "loss_reaction",
+    "gain_reaction",
+    "volatility_comfort",
+    "decision_speed",
+    "emotional_control",
+    "risk_appetite",
+    "experience_judgment",
+    "position_sizing",
+    "consistency",
+    "impulse_vs_logic",
+]
+
+STATED_STYLES = ["Conservative", "Moderate", "Aggressive"]
+
+ACTUAL_BEHAVIORS = [
+    "Very Cautious",
+    "Cautious",
+    "Balanced",
+    "Confident",
+    "High-Risk / Impulsive",
+]
+
+SELF_AWARENESS_LEVELS = [
+    "Strong Match",
+    "Mostly Consistent",
+    "Some Hidden Anxiety",
+    "Acting Riskier Than You Think",
+]
+
+PROFILE_DATA_PATTERN = re.compile(r"<!--\s*PROFILE_DATA:(.*?)-->", re.DOTALL)
+
+
+class ScoreCounter:
+    """
+    Exact count of every distinct score seen.
+
+    A score is the mean of at most 15 answers on the A–D scale, so it is
+    one of a few hundred fractions. Keying by the exact Fraction keeps
+    percentiles exact while the structure stays small and mergeable.
+    """
+
+    def __init__(self, counts=None):
+        self.counts = dict(counts) if counts else {}
+        self.total = sum(self.counts.values())
+
+    def add(self, score):
+        self.counts[score] = self.counts.get(score, 0) + 1
+        self.total += 1
+
+    def remove(self, score):
+        self.counts[score] -= 1
+        if not self.counts[score]:
+            del self.counts[score]
+        self.total -= 1
+
+    def merge(self, other):
+        for score, count in other.counts.items():
+            self.counts[score] = self.counts.get(score, 0) + count
+        self.total += other.total
+
+    def share_below(self, score):
+        """Percentage of recorded scores strictly lower than `score`."""
+        if not self.total:
+            return None
+        below = sum(c for s, c in self.counts.items() if s < score)
+        return 100.0 * below / self.total
+
+    def share_above(self, score):
+        """Percentage of recorded scores strictly higher than `score`."""
+        if not self.total:
+            return None
+        above = sum(c for s, c in self.counts.items() if s > score)
+        return 100.0 * above / self.total
+
+    def quantile(self, q):
+        if not self.total:
+            return None
+        target = q * self.total
+        running = 0
+        for score in sorted(self.counts):
+            running += self.counts[score]
+            if running >= target:
+                return float(score)
+        return float(max(self.counts))
+
+    def to_dict(self):
+        return {str(score): count for score, count in self.counts.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({Fraction(score): count for score, count in (data or {}).items()})
+
+
+def parse_risk_profile(summary_text):
+    """
+    Extract a structured profile from a completed risk assessment.
+
+    Returns None when the summary carries no PROFILE_DATA block or the
+    block holds no valid dimension=answer pairs.
+    """
+    match = PROFILE_DATA_PATTERN.search(summary_text)
+    if not match:
+        return None
+
+    answers = {}
+    for pair in match.group(1).split(";"):
+        if "=" not in pair:
+            continue
+        dimension, answer = (part.strip() for part in pair.split("=", 1))
+        dimension = dimension.lower()
+        answer = answer.upper()[:1]
+        if dimension in DIMENSIONS and answer in ANSWER_SCORES:
+            answers.setdefault(dimension, []).append(answer)
+
+    # A block with no usable pairs tells us nothing about behaviour.
+    if not answers:
+        return None
+
+    return {
+        "answers": answers,
+        "stated_style": _pick_label(summary_text, "Your Stated Style", STATED_STYLES),
+        "actual_behavior": _pick_label(
+            summary_text, "How You Actually Responded", ACTUAL_BEHAVIORS
+        ),
+        "self_awareness": _pick_label(
+            summary_text, "Self-Awareness Level", SELF_AWARENESS_LEVELS
+        ),
+    }
+
+
+def strip_profile_data(summary_text):
+    return PROFILE_DATA_PATTERN.sub("", summary_text).rstrip()
+
+
+def _pick_label(summary_text, heading, labels):
+    match = re.search(
+        rf"{re.escape(heading)}:\s*(?:</b>)?\s*([^\n<]+)", summary_text
+    )
+    if not match:
+        return None
+    value = match.group(1).strip().lower()
+    # Longest first so "Cautious" does not shadow "Very Cautious".
+    for label in sorted(labels, key=len, reverse=True):
+        if label.lower() in value:
+            return label
+    return None
+
+
+def _dimension_score(answers):
+    return Fraction(sum(ANSWER_SCORES[a] for a in answers), len(answers))
+
+
+def _overall_score(profile):
+    flat = [a for answers in profile["answers"].values() for a in answers]
+    return _dimension_score(flat) if flat else None
+
+
+class CohortAnalytics:
+    """
+    Running aggregates over every completed risk profile.
+
+    Each ingest touches a constant number of counters, so cost does not
+    grow with history. Instances serialize to JSON and merge, which lets
+    each worker keep its own shard while readers combine them.
+    """
+
+    def __init__(self):
+        self.profiles = 0
+        # Bumped on every change so cached views know when to rebuild.
+        self.version = 0
+        self.dimensions = {d: ScoreCounter() for d in DIMENSIONS}
+        self.overall = ScoreCounter()
+        self.stated_vs_actual = {}
+        self.self_awareness = {}
+
+    def ingest(self, profile):
+        self.profiles += 1
+        self.version += 1
+
+        for dimension, answers in profile["answers"].items():
+            self.dimensions[dimension].add(_dimension_score(answers))
+
+        overall = _overall_score(profile)
+        if overall is not None:
+            self.overall.add(overall)
+
+        stated = profile.get("stated_style") or "Unknown"
+        actual = profile.get("actual_behavior") or "Unknown"
+        row = self.stated_vs_actual.setdefault(stated, {})
+        row[actual] = row.get(actual, 0) + 1
+
+        awareness = profile.get("self_awareness") or "Unknown"
+        self.self_awareness[awareness] = self.self_awareness.get(awareness, 0) + 1
+
+    def remove(self, profile):
+        """Undo an earlier `ingest` of the same profile."""
+        self.profiles -= 1
+        self.version += 1
+
+        for dimension, answers in profile["answers"].items():
+            self.dimensions[dimension].remove(_dimension_score(answers))
+
+        overall = _overall_score(profile)
+        if overall is not None:
+            self.overall.remove(overall)
+
+        stated = profile.get("stated_style") or "Unknown"
+        actual = profile.get("actual_behavior") or "Unknown"
+        row = self.stated_vs_actual[stated]
+        row[actual] -= 1
+        if not row[actual]:
+            del row[actual]
+        if not row:
+            del self.stated_vs_actual[stated]
+
+        awareness = profile.get("self_awareness") or "Unknown"
+        self.self_awareness[awareness] -= 1
+        if not self.self_awareness[awareness]:
+            del self.self_awareness[awareness]
+
+    def merge(self, other):
+        self.profiles += other.profiles
+        for dimension in DIMENSIONS:
+            self.dimensions[dimension].merge(other.dimensions[dimension])
+        self.overall.merge(other.overall)
+        for stated, row in other.stated_vs_actual.items():
+            target = self.stated_vs_actual.setdefault(stated, {})
+            for actual, count in row.items():
+                target[actual] = target.get(actual, 0) + count
+        for awareness, count in other.self_awareness.items():
+            self.self_awareness[awareness] = (
+                self.self_awareness.get(awareness, 0) + count
+            )
+
+    def position(self, profile):
+        """
+        Where a profile sits in the cohort, per dimension.
+
+        `more_cautious_than` is the share of users with a strictly more
+        aggressive score; `more_aggressive_than` is the reverse.
+        """
+        result = {}
+        for dimension, answers in profile["answers"].items():
+            counter = self.dimensions[dimension]
+            score = _dimension_score(answers)
+            result[dimension] = {
+                "score": float(score),
+                "more_cautious_than": counter.share_above(score),
+                "more_aggressive_than": counter.share_below(score),
+            }
+
+        overall = _overall_score(profile)
+        if overall is not None:
+            result["overall"] = {
+                "score": float(overall),
+                "more_cautious_than": self.overall.share_above(overall),
+                "more_aggressive_than": self.overall.share_below(overall),
+            }
+        return result
+
+    def summary(self):
+        return {
+            "profiles": self.profiles,
+            "dimensions": {
+                dimension: {
+                    "count": counter.total,
+                    "p25": counter.quantile(0.25),
+                    "median": counter.quantile(0.5),
+                    "p75": counter.quantile(0.75),
+                }
+                for dimension, counter in self.dimensions.items()
+            },
+            "stated_vs_actual": self.stated_vs_actual,
+            "self_awareness": self.self_awareness,
+        }
+
+    def to_dict(self):
+        return {
+            "profiles": self.profiles,
+            "dimensions": {d: c.to_dict() for d, c in self.dimensions.items()},
+            "overall": self.overall.to_dict(),
+            "stated_vs_actual": self.stated_vs_actual,
+            "self_awareness": self.self_awareness,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        analytics = cls()
+        analytics.profiles = data.get("profiles", 0)
+        for dimension, counts in data.get("dimensions", {}).items():
+            if dimension in analytics.dimensions:
+                analytics.dimensions[dimension] = ScoreCounter.from_dict(counts)
+        analytics.overall = ScoreCounter.from_dict(data.get("overall"))
+        analytics.stated_vs_actual = data.get("stated_vs_actual", {})
+        analytics.self_awareness = data.get("self_awareness", {})
+        return analytics
+
+    def save(self, path):
+        # Write-then-rename so a concurrent reader never sees a partial file.
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def load_or_create(cls, path):
+        """Resume a worker's own shard so a restart never overwrites history."""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls()
+
+
+class CohortView:
+    """
+    Cohort-wide view served from memory.
+
+    Combines this worker's live analytics with every other shard in the
+    directory. Other shards are rescanned at most once per
+    `refresh_seconds`, and a shard is only re-parsed when its mtime
+    changes. Reads between refreshes never touch the disk.
+    """
+
+    def __init__(self, local, directory, local_path, refresh_seconds=30):
+        self.local = local
+        self.directory = directory
+        self.local_path = os.path.abspath(local_path)
+        self.refresh_seconds = refresh_seconds
+        self._shards = {}
+        self._others = CohortAnalytics()
+        self._checked_at = None
+        self._merged = None
+        self._merged_local_version = None
+
+    def get(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_seconds:
+            self._refresh_shards()
+            self._checked_at = now
+
+        if self._merged is None or self._merged_local_version != self.local.version:
+            merged = CohortAnalytics()
+            merged.merge(self._others)
+            merged.merge(self.local)
+            self._merged = merged
+            self._merged_local_version = self.local.version
+        return self._merged
+
+    def _refresh_shards(self):
+        changed = False
+        seen = set()
+        for path in glob.glob(os.path.join(self.directory, "cohort_*.json")):
+            path = os.path.abspath(path)
+            if path == self.local_path:
+                continue
+            try:
+                mtime = os.path.getmtime(path)
+                seen.add(path)
+                cached = self._shards.get(path)
+                if cached is not None and cached[0] == mtime:
+                    continue
+                self._shards[path] = (mtime, CohortAnalytics.load(path))
+                changed = True
+            except (OSError, ValueError):
+                continue
+
+        for path in set(self._shards) - seen:
+            del self._shards[path]
+            changed = True
+
+        if changed:
+            others = CohortAnalytics()
+            for _, shard in self._shards.values():
+                others.merge(shard)
+            self._others = others
+            self._merged = None
@@ -0,0 +1,161 @@
+# asset_resolver.py
+
+import difflib
+import json
+import os
+import re
+
+
+DEFAULT_ASSETS_PATH = os.path.join(os.path.dirname(__file__), "data", "assets.json")
+
+MIN_PREFIX_LENGTH = 4
+FUZZY_CUTOFF = 0.85
+
+# Words that can surround an asset name without changing which asset is meant.
+FILLER_WORDS = {
+    "a", "about", "analyse", "analysis", "analyze", "any", "asset", "at",
+    "check", "crypto", "current", "currently", "do", "doing", "for", "give",
+    "how", "i", "in", "is", "it", "latest", "like", "look", "market", "me",
+    "news", "now", "of", "on", "please", "price", "prices", "right", "s",
+    "sentiment", "share", "shares", "stock", "stocks", "tell", "the", "think",
+    "to", "today", "want", "what", "whats", "would", "you",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9&/.\-]+")
+
+
+class _TrieNode:
+    __slots__ = ("children", "asset_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.asset_ids = set()
+
+
+class AssetResolver:
+    """
+    Resolves a user's message to a canonical asset without a model call.
+
+    Aliases are matched greedily, longest phrase first, and only an exact
+    alias match is ever reported as resolved. When the only significant
+    word matches nothing exactly, unique prefix completions ("ethere" →
+    Ethereum) and close spellings ("bitcoim" → Bitcoin) are returned as
+    ambiguous candidates, so the agent still makes the final call.
+    """
+
+    def __init__(self, assets, ambiguous_terms=None):
+        self.assets = {asset["id"]: asset for asset in assets}
+        self.aliases = {}
+        # Terms with several plausible meanings always go to the agent; each
+        # entry in the data file records its candidates and why.
+        self.ambiguous_terms = {
+            _normalize(term): entry["candidates"]
+            for term, entry in (ambiguous_terms or {}).items()
+        }
+        self._trie = _TrieNode()
+
+        for asset in assets:
+            names = [asset["symbol"], asset["name"], *asset.get("aliases", [])]
+            for alias in names:
+                alias = _normalize(alias)
+                if alias in self.ambiguous_terms:
+                    continue
+                self.aliases[alias] = asset["id"]
+                self._insert(alias, asset["id"])
+
+        self._fuzzy_keys = [alias for alias in self.aliases if " " not in alias]
+        self._max_alias_words = max(
+            len(phrase.split()) for phrase in [*self.aliases, *self.ambiguous_terms]
+        )
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_ASSETS_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["assets"], data.get("ambiguous"))
+
+    def _insert(self, alias, asset_id):
+        node = self._trie
+        for char in alias:
+            node = node.children.setdefault(char, _TrieNode())
+            node.asset_ids.add(asset_id)
+
+    def _complete_prefix(self, prefix):
+        node = self._trie
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.asset_ids
+
+    def resolve(self, message):
+        """
+        Returns a dict with `status` ("resolved", "ambiguous" or "unknown"),
+        the matched `asset` when resolved, and candidate asset ids otherwise.
+
+        A message only resolves when one asset's aliases account for every
+        word in it apart from FILLER_WORDS. Any other word may name an asset
+        outside the bundled list ("Rivian vs Tesla"), so the message is left
+        to the agent.
+        """
+        tokens = _tokenize(message)
+        matched = set()
+        ambiguous = set()
+        saw_ambiguous_term = False
+        leftover = []
+
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self._max_alias_words, len(tokens) - i), 0, -1):
+                phrase = " ".join(tokens[i : i + n])
+                if phrase in self.aliases:
+                    matched.add(self.aliases[phrase])
+                    break
+                if phrase in self.ambiguous_terms:
+                    saw_ambiguous_term = True
+                    ambiguous.update(self.ambiguous_terms[phrase])
+                    break
+            else:
+                leftover.append(tokens[i])
+            i += n
+
+        leftover = [token for token in leftover if token not in FILLER_WORDS]
+
+        # Prefix and close-spelling hits are guesses: they are offered to the
+        # agent as candidates but never confirmed locally.
+        if not matched and not saw_ambiguous_term and len(leftover) == 1:
+            ambiguous.update(self._approximate(leftover[0]))
+
+        if len(matched) == 1 and not saw_ambiguous_term and not leftover:
+            asset_id = next(iter(matched))
+            return {"status": "resolved", "asset": self.assets[asset_id]}
+
+        candidates = sorted(matched | ambiguous)
+        if candidates or saw_ambiguous_term:
+            return {"status": "ambiguous", "candidates": candidates}
+        return {"status": "unknown", "candidates": []}
+
+    def _approximate(self, token):
+        if len(token) >= MIN_PREFIX_LENGTH:
+            completions = self._complete_prefix(token)
+            if len(completions) == 1:
+                return set(completions)
+
+        close = difflib.get_close_matches(
+            token, self._fuzzy_keys, n=3, cutoff=FUZZY_CUTOFF
+        )
+        return {self.aliases[alias] for alias in close}
+
+
+def _normalize(text):
+    return " ".join(_tokenize(text))
+
+
+def _tokenize(text):
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        # Drop sentence punctuation but keep inner dots ("brk.b").
+        token = token.strip(".-/")
+        if token:
+            tokens.append(token)
+    return tokens
@@ -8,6 +8,18 @@ from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from google.adk.memory import InMemoryMemoryService
+import os
+import socket
+from typing import Optional
+
+from analytics import (
+    CohortAnalytics,
+    CohortView,
+    parse_risk_profile,
+    strip_profile_data,
+)
+from asset_resolver import AssetResolver
+from request_guard import SessionRequestGuard
 
 
 # --- Agents ---
@@ -35,6 +47,22 @@ session_service = InMemorySessionService()
 
 session_state_store = {}
 
+# Each worker keeps its own shard; readers merge every shard in the directory.
+# The shard name must be unique per live worker and stable across restarts.
+ANALYTICS_DIR = os.getenv("COHORT_ANALYTICS_DIR", "analytics_data")
+ANALYTICS_SHARD = os.getenv(
+    "COHORT_ANALYTICS_SHARD", f"{socket.gethostname()}_{os.getpid()}"
+)
+analytics_shard_path = os.path.join(ANALYTICS_DIR, f"cohort_{ANALYTICS_SHARD}.json")
+cohort_analytics = CohortAnalytics.load_or_create(analytics_shard_path)
+cohort_view = CohortView(cohort_analytics, ANALYTICS_DIR, analytics_shard_path)
+
+# One agent turn at a time per session history; retried turns are replayed.
+request_guard = SessionRequestGuard()
+
+# Resolves obvious assets locally so the sentiment agent can skip STEP 0.
+asset_resolver = AssetResolver.from_file()
+
 # RUNNERS
 
 risk_runner = Runner(
@@ -61,6 +89,7 @@ advisor_runner = Runner(
 class ChatRequest(BaseModel):
     message: str
     session_id: str
+    idempotency_key: Optional[str] = None
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -75,6 +104,12 @@ def chat_page_ui(request: Request):
 
 @app.post("/risk")
 async def chat_with_agent(req: ChatRequest):
+    return await request_guard.run(
+        req.session_id, req.idempotency_key, lambda: _risk_turn(req)
+    )
+
+
+async def _risk_turn(req: ChatRequest):
     try:
         await session_service.create_session(
             app_name=APP_NAME, user_id=DEFAULT_USER_ID, session_id=req.session_id
@@ -99,6 +134,22 @@ async def chat_with_agent(req: ChatRequest):
         if req.session_id not in session_state_store:
             session_state_store[req.session_id] = {}
 
+        profile = parse_risk_profile(agent_response_text)
+        agent_response_text = strip_profile_data(agent_response_text)
+
+        if profile is not None:
+            # A retake or repeated summary replaces this session's earlier
+            # profile rather than counting the same user twice.
+            previous = session_state_store[req.session_id].get("risk_profile")
+            if previous is not None:
+                cohort_analytics.remove(previous)
+            session_state_store[req.session_id]["risk_profile"] = profile
+            cohort_analytics.ingest(profile)
+            try:
+                cohort_analytics.save(analytics_shard_path)
+            except OSError as e:
+                print(f"[Cohort Analytics] Could not persist shard > {e}")
+
         session_state_store[req.session_id]["risk_summary"] = agent_response_text
         session = await session_service.get_session(
             app_name=APP_NAME, user_id=DEFAULT_USER_ID, session_id=req.session_id
@@ -115,6 +166,14 @@ def sentiment_ui(request: Request):
 
 @app.post("/sentiment")
 async def sentiment_agent(req: ChatRequest):
+    return await request_guard.run(
+        f"{req.session_id}_sentiment",
+        req.idempotency_key,
+        lambda: _sentiment_turn(req),
+    )
+
+
+async def _sentiment_turn(req: ChatRequest):
 
     sentiment_history_id = f"{req.session_id}_sentiment"
 
@@ -125,7 +184,23 @@ async def sentiment_agent(req: ChatRequest):
     except Exception:
         pass
 
-    query_content = types.Content(role="user", parts=[types.Part(text=req.message)])
+    if req.session_id not in session_state_store:
+        session_state_store[req.session_id] = {}
+
+    message = req.message
+    resolution = asset_resolver.resolve(req.message)
+    if resolution["status"] == "resolved":
+        asset = resolution["asset"]
+        session_state_store[req.session_id]["asset_id"] = asset["id"]
+        message = (
+            f"ASSET_CONFIRMED: {asset['name']} "
+            f"({asset['symbol']}, {asset['type']})\n\n{req.message}"
+        )
+    else:
+        # A stale id would key caches to an asset this turn is not about.
+        session_state_store[req.session_id].pop("asset_id", None)
+
+    query_content = types.Content(role="user", parts=[types.Part(text=message)])
     agent_response_text = ""
 
     async for event in sentiment_runner.run_async(
@@ -138,9 +213,6 @@ async def sentiment_agent(req: ChatRequest):
             if text and text != "None":
                 agent_response_text += text
 
-    if req.session_id not in session_state_store:
-        session_state_store[req.session_id] = {}
-
     session_state_store[req.session_id]["sentiment_summary"] = agent_response_text
     session = await session_service.get_session(
         app_name=APP_NAME, user_id=DEFAULT_USER_ID, session_id=sentiment_history_id
@@ -152,6 +224,14 @@ async def sentiment_agent(req: ChatRequest):
 
 @app.post("/advisor")
 async def advisor(req: ChatRequest):
+    return await request_guard.run(
+        f"{req.session_id}_advisor",
+        req.idempotency_key,
+        lambda: _advisor_turn(req),
+    )
+
+
+async def _advisor_turn(req: ChatRequest):
 
     advisor_history_id = f"{req.session_id}_advisor"
 
@@ -201,3 +281,22 @@ async def advisor(req: ChatRequest):
 @app.get("/advisor", response_class=HTMLResponse)
 def advisor_ui(request: Request):
     return templates.TemplateResponse("advisor_page.html", {"request": request})
+
+
+@app.get("/analytics/cohort")
+def cohort_summary():
+    return cohort_view.get().summary()
+
+
+@app.get("/analytics/position/{session_id}")
+def cohort_position(session_id: str):
+    profile = session_state_store.get(session_id, {}).get("risk_profile")
+    if profile is None:
+        return {"position": None}
+
+    return {"position": cohort_view.get().position(profile)}
+
+
+@app.get("/metrics/requests")
+def request_metrics():
+    return request_guard.metrics
@@ -0,0 +1,58 @@
+# request_guard.py
+
+import asyncio
+from collections import OrderedDict
+
+
+class SessionRequestGuard:
+    """
+    Serializes agent runs per session and replays duplicate submissions.
+
+    Requests for the same session run one at a time, so two turns never
+    append to the same session history concurrently. A request carrying an
+    idempotency key that already completed for that session gets the cached
+    response back instead of starting another model run. A duplicate that
+    arrives while the first attempt is still running waits on the session
+    lock and is answered from the cache once the first attempt finishes.
+    """
+
+    def __init__(self, max_cached_responses=2048):
+        self.max_cached_responses = max_cached_responses
+        self._locks = {}
+        self._waiters = {}
+        self._responses = OrderedDict()
+        self.metrics = {
+            "requests": 0,
+            "duplicates_suppressed": 0,
+            "serialized_waits": 0,
+        }
+
+    async def run(self, session_id, idempotency_key, handler):
+        self.metrics["requests"] += 1
+
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        self._waiters[session_id] = self._waiters.get(session_id, 0) + 1
+        if lock.locked():
+            self.metrics["serialized_waits"] += 1
+
+        try:
+            async with lock:
+                cache_key = (session_id, idempotency_key)
+                if idempotency_key and cache_key in self._responses:
+                    self.metrics["duplicates_suppressed"] += 1
+                    self._responses.move_to_end(cache_key)
+                    return self._responses[cache_key]
+
+                # Failures are not cached, so a retry after an error runs again.
+                response = await handler()
+
+                if idempotency_key:
+                    self._responses[cache_key] = response
+                    if len(self._responses) > self.max_cached_responses:
+                        self._responses.popitem(last=False)
+                return response
+        finally:
+            self._waiters[session_id] -= 1
+            if not self._waiters[session_id]:
+                del self._waiters[session_id]
+                del self._locks[session_id]
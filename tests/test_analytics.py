@@ -0,0 +1,25 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from analytics import CohortAnalytics, parse_risk_profile
+
+
+def _profile(loss_answer):
+    return parse_risk_profile(
+        "<b>Your Stated Style:</b> Moderate\n"
+        f"<!-- PROFILE_DATA: loss_reaction={loss_answer}; gain_reaction=A -->"
+    )
+
+
+def test_remove_undoes_ingest():
+    analytics = CohortAnalytics()
+    analytics.ingest(_profile("D"))
+    before = analytics.to_dict()
+
+    retaken = _profile("A")
+    analytics.ingest(retaken)
+    analytics.remove(retaken)
+
+    assert analytics.to_dict() == before
@@ -0,0 +1,38 @@
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from asset_resolver import AssetResolver
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return AssetResolver.from_file()
+
+
+@pytest.mark.parametrize("message", ["ton", "metal", "rust", "micro"])
+def test_approximate_matches_are_not_confirmed(resolver, message):
+    assert resolver.resolve(message)["status"] != "resolved"
+
+
+@pytest.mark.parametrize(
+    "message, asset_id",
+    [
+        ("gold", "commodity:gold"),
+        ("What's the price of gold?", "commodity:gold"),
+        ("bnb", "crypto:bnb"),
+        ("s and p 500", "index:spx"),
+    ],
+)
+def test_exact_aliases_resolve(resolver, message, asset_id):
+    result = resolver.resolve(message)
+    assert result["status"] == "resolved"
+    assert result["asset"]["id"] == asset_id
+
+
+def test_close_spelling_is_offered_as_candidate(resolver):
+    result = resolver.resolve("bitcoim")
+    assert result == {"status": "ambiguous", "candidates": ["crypto:btc"]}